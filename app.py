@@ -2,8 +2,14 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import numpy as np
+import os
+from html import escape
+from types import SimpleNamespace
+
+from convert_to_parquet import apply_dtypes
 
 
 # Page config
@@ -32,6 +38,21 @@ st.markdown("""
         background-color: #FF4B4B;
         color: white !important;
     }
+    .metric-row {
+        display: flex;
+        gap: 1rem;
+    }
+    .metric-tile {
+        flex: 1;
+    }
+    .metric-label {
+        font-size: 14px;
+        color: #31333F;
+    }
+    .metric-value {
+        font-size: 2.25rem;
+        color: #31333F;
+    }
 </style>
 """, unsafe_allow_html=True)
 
@@ -50,26 +71,258 @@ SODA_TYPE_COLORS = {
     'Modern': '#06D6A0'
 }
 
-# Load data
-@st.cache_data
-def load_data():
-    possible_paths = [
-        'Master_Data_Final_Clean.xlsx',
-        '/mnt/user-data/outputs/Master_Data_Final_Clean.xlsx',
-        '../Master_Data_Final_Clean.xlsx',
-    ]
-    
-    for path in possible_paths:
-        try:
-            df = pd.read_excel(path)
-            return df
-        except FileNotFoundError:
-            continue
+# Series forms for vectorized color lookup (reindex instead of per-bar dict.get)
+BRAND_COLOR_S = pd.Series(BRAND_COLORS)
+TYPE_COLOR_S = pd.Series(SODA_TYPE_COLORS)
+
+# One shared Plotly template, so Streamlit doesn't merge its theme into every chart
+pio.templates.default = 'plotly_white'
+
+# Render a Plotly figure without the modebar. The figures are cached singletons shared
+# across sessions, so this only reads them; the builders set uirevision='soda' (the
+# browser keeps the existing layout instead of re-diffing it on each rerun) and
+# marker_line_width=0 (bars skip their outline stroke) when they create the figure.
+def show(fig, **kw):
+    st.plotly_chart(fig, width='stretch', theme=None,
+                    config={'displayModeBar': False, 'responsive': True}, **kw)
+
+# A row of metric tiles as one HTML element instead of st.columns + one st.metric each.
+# items: (label, value) or (label, value, tip) tuples; tip shows as a hover tooltip.
+def metric_row(items):
+    tiles = ''.join(
+        f"<div class='metric-tile' title='{escape(tip[0] if tip else '')}'>"
+        f"<div class='metric-label'>{escape(str(label))}</div><div class='metric-value'>{escape(str(value))}</div></div>"
+        for label, value, *tip in items
+    )
+    st.html(f"<div class='metric-row'>{tiles}</div>")
+
+# Pie/donut built directly as a go.Pie trace (skips plotly.express preprocessing)
+def pie_chart(series, colors, title=None, hole=0.4):
+    fig = go.Figure(go.Pie(
+        labels=series.index.to_numpy(),
+        values=series.to_numpy(),
+        hole=hole,
+        marker=dict(colors=colors),
+        textposition='inside',
+        textinfo='percent+label'
+    ), layout=dict(uirevision='soda'))
+    if title:
+        fig.update_layout(title=title)
+    return fig
+
+# Columns the Amazon views read; the cached slice keeps only these
+AMAZON_COLUMNS = [
+    'brand_clean', 'parent_brand', 'soda_type', 'title', 'price', 'pack_size',
+    'volume_oz', 'units_sold_last_month', 'price_per_oz', 'velocity_score', 'estimated_monthly_revenue',
+]
+
+# Everything the dashboard reads: the Amazon columns plus the Walmart review-count proxy
+LOAD_COLUMNS = AMAZON_COLUMNS + ['Platform', 'review_count', 'revenue_proxy']
+
+# Data file locations, checked in order; the Parquet copy (see convert_to_parquet.py) wins over
+# Excel unless the Excel master has been edited since the copy was written
+DATA_PATHS = [
+    'Master_Data_Final_Clean.xlsx',
+    '/mnt/user-data/outputs/Master_Data_Final_Clean.xlsx',
+    '../Master_Data_Final_Clean.xlsx',
+]
+
+# Seconds the Excel file may be newer than its Parquet copy and still count as the same data:
+# a fresh git checkout writes both files moments apart, the .xlsx last
+PARQUET_MTIME_SLACK = 60
+
+def data_path():
+    for xlsx_path in DATA_PATHS:
+        parquet_path = xlsx_path.replace('.xlsx', '.parquet')
+        has_xlsx, has_parquet = os.path.exists(xlsx_path), os.path.exists(parquet_path)
+        if has_parquet and not has_xlsx:
+            return parquet_path
+        if has_parquet and os.path.getmtime(xlsx_path) - os.path.getmtime(parquet_path) <= PARQUET_MTIME_SLACK:
+            return parquet_path
+        if has_xlsx:
+            if has_parquet:
+                st.warning(f"{xlsx_path} is newer than its Parquet copy, so the Excel file is loaded. "
+                           "Run `python convert_to_parquet.py` to refresh the copy.")
+            return xlsx_path
     
     st.error("Could not find Master_Data_Final_Clean.xlsx")
     st.stop()
-    
-df = load_data()
+
+# Load data (persisted to Streamlit's disk cache so restarts skip the file parse).
+# The path and its modification time are part of the cache key, so a regenerated
+# data file replaces the stale entry instead of being shadowed by it.
+@st.cache_data(persist="disk", show_spinner="Loading market data...")
+def load_data(path, mtime):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=LOAD_COLUMNS)
+
+    df = pd.read_excel(path, usecols=LOAD_COLUMNS)
+    # Match the Parquet copy: string brands (mixed int/str in the sheet), then the same
+    # categorical keys and downcast numerics as convert_to_parquet.py
+    df['brand_clean'] = df['brand_clean'].astype(str)
+    return apply_dtypes(df)
+
+# Aggregations (computed once inside the cached bundle below)
+def type_revenue(amazon):
+    return amazon.groupby('soda_type', observed=True)['estimated_monthly_revenue'].sum().sort_values(ascending=False)
+
+def brand_revenue(amazon):
+    return amazon.groupby('brand_clean', observed=True)['estimated_monthly_revenue'].sum()
+
+def parent_revenue(amazon):
+    return amazon.groupby('parent_brand', observed=True)['estimated_monthly_revenue'].sum().sort_values(ascending=False)
+
+def type_brand_revenue(amazon):
+    # One (soda_type, brand_clean) groupby for every type, split into one Series per type
+    by_type_brand = amazon.groupby(['soda_type', 'brand_clean'], observed=True)['estimated_monthly_revenue'].sum()
+    # Only types that occur get a key; callers .get() the fixed type list
+    return {t: by_type_brand.xs(t, level='soda_type') for t in by_type_brand.index.unique(level='soda_type')}
+
+def parent_brand_revenue(amazon):
+    # Sub-brand revenue for every parent brand from one (parent_brand, brand_clean) groupby
+    by_parent_brand = amazon.groupby(['parent_brand', 'brand_clean'], observed=True)['estimated_monthly_revenue'].sum()
+    return {p: by_parent_brand.xs(p, level='parent_brand') for p in by_parent_brand.index.unique(level='parent_brand')}
+
+def type_analysis(amazon):
+    return amazon.groupby('soda_type', observed=True).agg({
+        'velocity_score': 'mean',
+        'estimated_monthly_revenue': 'sum'
+    }).reset_index()
+
+def type_weighted_price_oz(amazon):
+    # Volume-weighted: Σ(price × units) / Σ(volume_oz × pack_size × units), one groupby for all types
+    valid = amazon.dropna(subset=['price', 'volume_oz', 'pack_size', 'units_sold_last_month'])
+    totals = valid.assign(
+        spend=valid['price'] * valid['units_sold_last_month'],
+        ounces=valid['volume_oz'] * valid['pack_size'] * valid['units_sold_last_month'],
+    ).groupby('soda_type', observed=True)[['spend', 'ounces']].sum()
+    
+    return (totals['spend'] / totals['ounces']).rename('price_per_oz').sort_values(ascending=False)
+
+def short_titles(titles, n):
+    # Trim to n characters with an ellipsis, as whole-column string ops
+    return titles.str.slice(0, n) + titles.str.len().gt(n).map({True: '...', False: ''})
+
+def topk(df, col, k):
+    # Top-k rows by col: a partition finds the k-th largest value in O(N), then only the rows
+    # at or above it are sorted. The stable sort keeps ties in row order, so the result matches
+    # nlargest(keep='first'), which also ranks missing values last.
+    if k <= 0:
+        return df.iloc[:0]
+    vals = df[col].to_numpy(dtype='float64', na_value=-np.inf)
+    cand = np.flatnonzero(vals >= np.partition(vals, -k)[-k]) if k < len(vals) else np.arange(len(vals))
+    return df.iloc[cand[np.argsort(-vals[cand], kind='stable')][:k]]
+
+def top_velocity(amazon, n):
+    return amazon.nlargest(n, 'velocity_score')[
+        ['brand_clean', 'title', 'velocity_score', 'soda_type']
+    ]
+
+def platform_price_comparison(df, n):
+    # Average price per brand on each platform, brands sold on both only
+    pivot = df.groupby(['brand_clean', 'Platform'], sort=False, observed=True)['price'].mean().unstack('Platform')
+    return (
+        pivot.dropna(subset=['Amazon', 'Walmart'])
+        .rename(columns={'Amazon': 'amazon_price', 'Walmart': 'walmart_price'})
+        .nlargest(n, 'amazon_price')
+        .rename_axis('brand')
+        .reset_index()
+    )
+
+def proxy_revenue(walmart, key):
+    return walmart.groupby(key, observed=True)['revenue_proxy'].sum()
+
+def walmart_summary(walmart, is_private):
+    # Overview and private label numbers: one agg plus one grouped pass on the private label mask
+    totals = walmart.agg({'revenue_proxy': 'sum', 'price': 'mean'})
+    by_private = walmart.groupby(is_private, sort=False).agg(
+        n=('price', 'size'),
+        proxy=('revenue_proxy', 'sum'),
+        price=('price', 'mean'),
+    )
+    # Either side may be absent; count and proxy fall back to 0, mean price to NaN
+    by_private = by_private.reindex([True, False]).fillna({'n': 0, 'proxy': 0})
+    
+    return {
+        'n': len(walmart),
+        'proxy': totals['revenue_proxy'],
+        'avg_price': totals['price'],
+        'private_n': int(by_private.loc[True, 'n']),
+        'private_proxy': by_private.loc[True, 'proxy'],
+        'private_price': by_private.loc[True, 'price'],
+        'branded_price': by_private.loc[False, 'price'],
+    }
+
+# Brands shown per soda type in the brand-leader pies; the rest roll up into "Others"
+TYPE_BRAND_TOP_N = {'Modern': 4, 'Traditional': 5, 'Diet': 5}
+
+def brands_with_others(brands, n):
+    top_brands = brands.nlargest(n)
+    others = brands.drop(top_brands.index).sum()
+    
+    plot_data = top_brands.copy()
+    if others > 0:
+        plot_data.loc['Others'] = others
+    return plot_data
+
+# Walmart store brands (Great Value, Sam's Choice, Member's Mark)
+PRIVATE_LABEL_PATTERN = r'great value|sam|member'
+
+# Platform slices and static aggregations, computed once per data file version.
+# cache_resource hands back the same objects on every rerun (no pickle round-trip);
+# the tabs only read from the bundle, never mutate it. Only what the tabs read is kept:
+# the full frame and the per-platform slices stay local so the cache doesn't pin them.
+@st.cache_resource(max_entries=1)
+def load_bundle(path, mtime):
+    df = load_data(path, mtime)
+    # One pass over Platform instead of a boolean mask per platform
+    platforms = {p: g.reset_index(drop=True) for p, g in df.groupby('Platform', observed=True, sort=False)}
+    amazon = platforms['Amazon'][AMAZON_COLUMNS]
+    walmart = platforms['Walmart']
+    walmart_is_private = walmart['brand_clean'].str.contains(PRIVATE_LABEL_PATTERN, case=False, regex=True, na=False)
+    type_brands = type_brand_revenue(amazon)
+    amazon_brand_rev = brand_revenue(amazon)
+    amazon_top_brands = amazon_brand_rev.nlargest(10)
+    amazon_parent_rev = parent_revenue(amazon)
+    amazon_type_analysis = type_analysis(amazon)
+    price_oz = type_weighted_price_oz(amazon)
+    amazon_top_velocity = top_velocity(amazon, 10)
+    
+    return SimpleNamespace(
+        amazon=amazon,
+        walmart_summary=walmart_summary(walmart, walmart_is_private),
+        walmart_proxy_by_type=proxy_revenue(walmart, 'soda_type'),
+        walmart_proxy_by_parent=proxy_revenue(walmart, 'parent_brand').nlargest(5),
+        walmart_top_proxy=topk(walmart, 'revenue_proxy', 10)[
+            ['brand_clean', 'title', 'review_count', 'price', 'revenue_proxy']
+        ],
+        walmart_top_private=topk(walmart[walmart_is_private], 'revenue_proxy', 5)[
+            ['title', 'price', 'review_count', 'revenue_proxy']
+        ],
+        amazon_type_rev=type_revenue(amazon),
+        amazon_top_brands=amazon_top_brands,
+        amazon_top_brand_colors=BRAND_COLOR_S.reindex(amazon_top_brands.index, fill_value='#06D6A0').to_numpy(),
+        amazon_parent_rev=amazon_parent_rev,
+        amazon_top_parents=amazon_parent_rev.head(10).index.tolist(),
+        amazon_by_parent={p: g for p, g in amazon.groupby('parent_brand', observed=True, sort=False)},
+        amazon_subbrand_rev=parent_brand_revenue(amazon),
+        amazon_type_analysis=amazon_type_analysis,
+        amazon_type_colors=TYPE_COLOR_S.reindex(amazon_type_analysis['soda_type']).to_numpy(),
+        type_weighted_price_oz=price_oz,
+        type_price_oz_colors=TYPE_COLOR_S.reindex(price_oz.index).to_numpy(),
+        amazon_top_velocity=amazon_top_velocity,
+        amazon_top_velocity_badge_css=(
+            'background-color: ' + TYPE_COLOR_S.reindex(amazon_top_velocity['soda_type']).to_numpy() + '; color: white;'
+        ),
+        platform_price_comparison=platform_price_comparison(df, 8),
+        type_brand_share={
+            t: brands_with_others(type_brands.get(t, pd.Series(dtype='float64')), n)
+            for t, n in TYPE_BRAND_TOP_N.items()
+        },
+    )
+
+DATA_FILE = data_path()
+bundle = load_bundle(DATA_FILE, os.path.getmtime(DATA_FILE))
 
 # Title
 st.markdown("""
@@ -84,14 +337,96 @@ by Archana Tatavarthi
 </p>
 """, unsafe_allow_html=True)
 
-# Tabs
-tab1, tab2, tab3, tab4 = st.tabs(["📋 Overview", "📦 Amazon Analysis", "🔄 Walmart & Cross-Platform", "🌐 Online vs Offline Reality"])
+# Tabs (on_change="rerun" makes them lazy: only the selected tab's body runs, see tabN.open below)
+tab1, tab2, tab3, tab4 = st.tabs(
+    ["📋 Overview", "📦 Amazon Analysis", "🔄 Walmart & Cross-Platform", "🌐 Online vs Offline Reality"],
+    key='active_tab',
+    on_change="rerun"
+)
 
 # ============================================================================
 # TAB 1: OVERVIEW
 # ============================================================================
 
-with tab1:
+# Static HTML blocks, built once at import
+METHODOLOGY_HTML_LEFT = """
+<div style='background: #fff3e0; padding: 20px; border-radius: 10px; border-left: 5px solid #ff9800;'>
+    <h4 style='margin-top: 0; color: #1a1a1a;'>Amazon Analysis (436 Products)</h4>
+    <p style='color: #1a1a1a;'><strong>Revenue Estimation:</strong></p>
+    <ul style='color: #1a1a1a;'>
+        <li>Based on "units sold last month" data (80% coverage)</li>
+        <li>Type-specific multipliers applied</li>
+        <li>Provides current velocity metrics</li>
+    </ul>
+    <p style='color: #1a1a1a;'><strong>Velocity Score (0-100):</strong></p>
+    <ul style='color: #1a1a1a;'>
+        <li><strong>Formula:</strong> 100 - (ln(BSR) × 10.857)</li>
+        <li><strong>BSR</strong> = Best Sellers Rank (Amazon's hourly ranking)</li>
+        <li><strong>Examples:</strong> BSR 1 = 100 velocity | BSR 10 = 75 | BSR 100 = 50</li>
+        <li>Logarithmic scale captures diminishing returns</li>
+    </ul>
+    <p style='color: #1a1a1a;'><strong>Coverage:</strong> 87% of products have BSR data</p>
+</div>
+"""
+
+METHODOLOGY_HTML_RIGHT = """
+<div style='background: #e3f2fd; padding: 20px; border-radius: 10px; border-left: 5px solid #2196f3;'>
+    <h4 style='margin-top: 0; color: #1a1a1a;'>Walmart Analysis (453 Products)</h4>
+    <p style='color: #1a1a1a;'><strong>Revenue Proxy:</strong></p>
+    <ul style='color: #1a1a1a;'>
+        <li><strong>Formula:</strong> Reviews × Price</li>
+        <li>Historical popularity indicator</li>
+        <li>NOT real-time velocity</li>
+    </ul>
+    <p style='color: #1a1a1a;'><strong>Use Cases:</strong></p>
+    <ul style='color: #1a1a1a;'>
+        <li>✅ Brand presence comparison</li>
+        <li>✅ Historical trends</li>
+        <li>❌ NOT for current sales velocity</li>
+        <li>❌ NOT for absolute revenue</li>
+    </ul>
+    <p style='color: #1a1a1a;'><strong>Note:</strong> Walmart data complements Amazon but uses different metrics</p>
+</div>
+"""
+
+SODA_TYPE_DEFS_HTML = """
+<div style='background: #f5f5f5; padding: 20px; border-radius: 10px; margin-top: 20px;'>
+    <h4 style='margin-top: 0; color: #1a1a1a;'>Soda Type Definitions:</h4>
+    <ul style='color: #1a1a1a;'>
+        <li><strong>Traditional:</strong> Classic sodas (Coca-Cola, Pepsi, Dr Pepper, Mountain Dew, Sprite)</li>
+        <li><strong>Diet:</strong> Zero/low-calorie variants (Diet Coke, Pepsi Zero, Coke Zero Sugar)</li>
+        <li><strong>Modern:</strong> Functional/prebiotic sodas (poppi, OLIPOP, Zevia, Bloom Nutrition, Culture Pop)</li>
+    </ul>
+</div>
+"""
+
+KEY_FINDINGS_HTML_LEFT = """
+<div style='background: #e8f5e9; padding: 20px; border-radius: 10px; border-left: 5px solid #4caf50;'>
+    <h4 style='margin-top: 0; color: #1a1a1a;'>Amazon Insights</h4>
+    <ul style='color: #1a1a1a;'>
+        <li>poppi & OLIPOP control 67.5% of modern soda revenue</li>
+        <li>Modern sodas: 1.7x price premium yet highest velocity</li>
+        <li>Coca-Cola Company leads overall (36.6% parent share)</li>
+        <li>PepsiCo doubled share post-poppi acquisition (12.9% to 23.3%)</li>
+    </ul>
+</div>
+"""
+
+KEY_FINDINGS_HTML_RIGHT = """
+<div style='background: #fff3e0; padding: 20px; border-radius: 10px; border-left: 5px solid #ff9800;'>
+    <h4 style='margin-top: 0; color: #1a1a1a;'>Market Reality</h4>
+    <ul style='color: #1a1a1a;'>
+        <li>Total US CSD market: $50-55B (offline-dominant)</li>
+        <li>Modern sodas: 3-4% offline vs 30% on Amazon</li>
+        <li>Online represents ~5% of total CSD sales</li>
+        <li>Traditional brands still dominate 95%+ of volume</li>
+    </ul>
+</div>
+"""
+
+# Fragment: reruns triggered elsewhere (e.g. the Parent Brand selectbox) don't re-walk this tab
+@st.fragment
+def tab1_overview(bundle):
     st.header("Project Overview")
     
     # Purpose
@@ -116,46 +451,10 @@ with tab1:
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        <div style='background: #fff3e0; padding: 20px; border-radius: 10px; border-left: 5px solid #ff9800;'>
-            <h4 style='margin-top: 0; color: #1a1a1a;'>Amazon Analysis (436 Products)</h4>
-            <p style='color: #1a1a1a;'><strong>Revenue Estimation:</strong></p>
-            <ul style='color: #1a1a1a;'>
-                <li>Based on "units sold last month" data (80% coverage)</li>
-                <li>Type-specific multipliers applied</li>
-                <li>Provides current velocity metrics</li>
-            </ul>
-            <p style='color: #1a1a1a;'><strong>Velocity Score (0-100):</strong></p>
-            <ul style='color: #1a1a1a;'>
-                <li><strong>Formula:</strong> 100 - (ln(BSR) × 10.857)</li>
-                <li><strong>BSR</strong> = Best Sellers Rank (Amazon's hourly ranking)</li>
-                <li><strong>Examples:</strong> BSR 1 = 100 velocity | BSR 10 = 75 | BSR 100 = 50</li>
-                <li>Logarithmic scale captures diminishing returns</li>
-            </ul>
-            <p style='color: #1a1a1a;'><strong>Coverage:</strong> 87% of products have BSR data</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(METHODOLOGY_HTML_LEFT)
     
     with col2:
-        st.markdown("""
-        <div style='background: #e3f2fd; padding: 20px; border-radius: 10px; border-left: 5px solid #2196f3;'>
-            <h4 style='margin-top: 0; color: #1a1a1a;'>Walmart Analysis (453 Products)</h4>
-            <p style='color: #1a1a1a;'><strong>Revenue Proxy:</strong></p>
-            <ul style='color: #1a1a1a;'>
-                <li><strong>Formula:</strong> Reviews × Price</li>
-                <li>Historical popularity indicator</li>
-                <li>NOT real-time velocity</li>
-            </ul>
-            <p style='color: #1a1a1a;'><strong>Use Cases:</strong></p>
-            <ul style='color: #1a1a1a;'>
-                <li>✅ Brand presence comparison</li>
-                <li>✅ Historical trends</li>
-                <li>❌ NOT for current sales velocity</li>
-                <li>❌ NOT for absolute revenue</li>
-            </ul>
-            <p style='color: #1a1a1a;'><strong>Note:</strong> Walmart data complements Amazon but uses different metrics</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(METHODOLOGY_HTML_RIGHT)
     
     st.markdown("---")
     
@@ -168,24 +467,15 @@ with tab1:
         st.metric("Total Products", "889", help="436 Amazon + 453 Walmart")
         
     with col2:
-        amazon_revenue = df[df['Platform'] == 'Amazon']['estimated_monthly_revenue'].sum()
+        amazon_revenue = bundle.amazon_type_rev.sum()
         st.metric("Amazon Monthly Revenue", f"${amazon_revenue/1e6:.2f}M")
     
     with col3:
-        modern_pct = len(df[(df['Platform'] == 'Amazon') & (df['soda_type'] == 'Modern')]) / len(df[df['Platform'] == 'Amazon']) * 100
+        modern_pct = (bundle.amazon['soda_type'] == 'Modern').sum() / len(bundle.amazon) * 100
         st.metric("Modern % (Amazon)", f"{modern_pct:.0f}%", help="17% of products, 30% of revenue")
     
     # Category breakdown
-    st.markdown("""
-    <div style='background: #f5f5f5; padding: 20px; border-radius: 10px; margin-top: 20px;'>
-        <h4 style='margin-top: 0; color: #1a1a1a;'>Soda Type Definitions:</h4>
-        <ul style='color: #1a1a1a;'>
-            <li><strong>Traditional:</strong> Classic sodas (Coca-Cola, Pepsi, Dr Pepper, Mountain Dew, Sprite)</li>
-            <li><strong>Diet:</strong> Zero/low-calorie variants (Diet Coke, Pepsi Zero, Coke Zero Sugar)</li>
-            <li><strong>Modern:</strong> Functional/prebiotic sodas (poppi, OLIPOP, Zevia, Bloom Nutrition, Culture Pop)</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(SODA_TYPE_DEFS_HTML)
     
     st.markdown("---")
     
@@ -195,47 +485,257 @@ with tab1:
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        <div style='background: #e8f5e9; padding: 20px; border-radius: 10px; border-left: 5px solid #4caf50;'>
-            <h4 style='margin-top: 0; color: #1a1a1a;'>Amazon Insights</h4>
-            <ul style='color: #1a1a1a;'>
-                <li>poppi & OLIPOP control 67.5% of modern soda revenue</li>
-                <li>Modern sodas: 1.7x price premium yet highest velocity</li>
-                <li>Coca-Cola Company leads overall (36.6% parent share)</li>
-                <li>PepsiCo doubled share post-poppi acquisition (12.9% to 23.3%)</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(KEY_FINDINGS_HTML_LEFT)
     
     with col2:
-        st.markdown("""
-        <div style='background: #fff3e0; padding: 20px; border-radius: 10px; border-left: 5px solid #ff9800;'>
-            <h4 style='margin-top: 0; color: #1a1a1a;'>Market Reality</h4>
-            <ul style='color: #1a1a1a;'>
-                <li>Total US CSD market: $50-55B (offline-dominant)</li>
-                <li>Modern sodas: 3-4% offline vs 30% on Amazon</li>
-                <li>Online represents ~5% of total CSD sales</li>
-                <li>Traditional brands still dominate 95%+ of volume</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(KEY_FINDINGS_HTML_RIGHT)
     
     st.info("""
     **💡 Strategic Implication:** Amazon serves as a discovery and trial channel for modern sodas. 
     DTC brands over-index online due to search-driven discovery, review influence, and subscription behavior. 
     However, offline distribution (convenience stores, restaurants, vending) remains critical for scale.
     """)
-    
+
+if tab1.open:
+    with tab1:
+        tab1_overview(bundle)
+
 
 # ============================================================================
 # TAB 2: AMAZON ANALYSIS (REORGANIZED)
 # ============================================================================
 
-with tab2:
+# Static HTML blocks, built once at import
+BRAND_VS_PARENT_HTML = """
+<div style='background: #e3f2fd; padding: 20px; border-radius: 10px; margin-bottom: 20px;'>
+    <h4 style='margin-top: 0; color: #1a1a1a;'>💡 Brand vs Parent Company:</h4>
+    <ul style='line-height: 2; color: #1a1a1a;'>
+        <li><strong>Individual brands:</strong> Coca-Cola ($743K) similar to poppi ($742K)</li>
+        <li><strong>Parent companies:</strong> Coca-Cola Company ($2.6M) much larger than PepsiCo ($1.7M)</li>
+        <li><strong>Why?</strong> Coca-Cola Company owns 12+ brands (Diet Coke, Coke Zero, Sprite, Health-Ade, etc.) - excludes fountain/foodservice</li>
+        <li>🔥 <strong>Recent Acquisition:</strong> poppi acquired by PepsiCo (2025) - doubled PepsiCo market share from 12.9% to 23.3%</li>
+        <li><strong>OLIPOP remains independent</strong> - the last major standalone modern soda brand</li>
+    </ul>
+</div>
+"""
+
+# Filled in with the number of Modern sodas in the top 10 velocity list
+VELOCITY_OBSERVATION_HTML = """
+<div style='background: #e8f5e9; padding: 15px; border-radius: 8px; border-left: 5px solid #4caf50;'>
+    <p style='margin: 0; font-size: 14px; color: #1a1a1a;'><strong>{modern_count}/10 top velocity products are Modern sodas!</strong></p>
+    <br>
+    <p style='margin: 0; font-size: 13px; color: #1a1a1a;'>Modern brands dominate high-velocity segment</p>
+</div>
+"""
+
+# Sub-brand pie per parent brand, built once per distinct sub-brand revenue Series
+@st.cache_resource
+def parent_subbrand_pie(subbrand_revenue):
+    # Calculate total revenue and percentages
+    total_revenue = subbrand_revenue.sum()
+    subbrand_pct = (subbrand_revenue / total_revenue * 100).sort_values(ascending=False)
+    
+    # Separate brands >5% and group rest as "Others"
+    significant_brands = subbrand_pct[subbrand_pct >= 5]
+    others_total = subbrand_pct[subbrand_pct < 5].sum()
+    
+    # Combine for display
+    display_data = significant_brands.copy()
+    if others_total > 0:
+        display_data.loc['Others'] = others_total
+    
+    # Corresponding revenue values, looked up by label in one reindex
+    display_revenue = subbrand_revenue.reindex(display_data.index)
+    if others_total > 0:
+        display_revenue['Others'] = subbrand_revenue[subbrand_pct < 5].sum()
+    
+    # Signature colors in one lookup; brands without one take the template colorway in order,
+    # starting where px.pie's color_discrete_map (BRAND_COLORS + 'Others') left the cycle
+    sub_colors = BRAND_COLOR_S.reindex(display_data.index)
+    sub_colors[display_data.index == 'Others'] = '#CCCCCC'
+    unmatched = sub_colors.isna().to_numpy()
+    palette = np.roll(pio.templates[pio.templates.default].layout.colorway, -(len(BRAND_COLORS) + 1))
+    sub_colors[unmatched] = np.resize(palette, unmatched.sum())
+    fig = pie_chart(display_revenue, sub_colors.to_numpy(), hole=0)
+    fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=11)
+    fig.update_layout(showlegend=False, height=300, margin=dict(t=0, b=0))
+    return fig
+
+# Parent Brand Deep Dive: a fragment, so the selectbox reruns only this section
+@st.fragment
+def parent_brand_section(amazon_filtered, parent_frames, parent_subbrand_rev, parent_list):
+    selected_parent = st.selectbox(
+        "Select Parent Brand:",
+        options=parent_list,
+        key='parent_brand_selector',
+        help="Analyze sub-brand performance within parent company"
+    )
+    
+    parent_df = parent_frames[selected_parent]  # pre-split in the bundle, no per-selection mask
+    parent_total_revenue = parent_df['estimated_monthly_revenue'].sum()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total SKUs", len(parent_df))
+    with col2:
+        st.metric("Total Revenue", f"${parent_total_revenue/1e6:.2f}M")
+    with col3:
+        market_share = (parent_total_revenue / amazon_filtered['estimated_monthly_revenue'].sum() * 100)
+        st.metric("Market Share", f"{market_share:.1f}%")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Sub-Brand Revenue Breakdown**")
+        
+        fig = parent_subbrand_pie(parent_subbrand_rev[selected_parent])
+        show(fig, key='parent_subbrand_pie')
+    
+    with col2:
+        st.markdown("**Top 5 SKUs by Revenue**")
+        top_skus = parent_df.nlargest(5, 'estimated_monthly_revenue')[
+            ['brand_clean', 'title', 'estimated_monthly_revenue', 'velocity_score', 'pack_size']
+        ]
+        
+        # One table element instead of a columns/markdown pair per row
+        top_skus_display = pd.DataFrame({
+            'Brand': top_skus['brand_clean'],
+            'Product': short_titles(top_skus['title'], 40),
+            'Revenue': top_skus['estimated_monthly_revenue'] / 1000,
+        })
+        st.dataframe(
+            top_skus_display,
+            hide_index=True,
+            width='stretch',
+            column_config={'Revenue': st.column_config.NumberColumn(format='$%.0fK')}
+        )
+
+# Amazon tab figures depend only on the cached data, so build each once per process
+@st.cache_resource
+def amazon_type_pie(type_rev):
+    fig = pie_chart(type_rev, TYPE_COLOR_S.reindex(type_rev.index).to_numpy())
+    fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=12)
+    fig.update_layout(showlegend=False, height=400, margin=dict(t=40, b=0))
+    return fig
+
+@st.cache_resource
+def amazon_parent_pie(all_parent_revenue, total_amazon_revenue):
+    # True market share percentages across all parent brands
+    all_parent_pct = (all_parent_revenue / total_amazon_revenue) * 100
+    
+    # Separate significant brands (≥5%) and small brands (<5%)
+    significant_brands = all_parent_pct[all_parent_pct >= 5]
+    small_brands = all_parent_pct[(all_parent_pct < 5) & (all_parent_pct.index != 'Other')]
+    
+    # Handle existing "Other" category separately
+    existing_other = all_parent_pct[all_parent_pct.index == 'Other'].sum() if 'Other' in all_parent_pct.index else 0
+    
+    # Combine small brands + existing "Other" into new "Other"
+    others_total_pct = small_brands.sum() + existing_other
+    
+    # Significant brands, labelled "<parent> (<pct>%)" (exclude "Other" if it somehow has >5%)
+    significant_brands = significant_brands[significant_brands.index != 'Other']
+    display_data = all_parent_revenue[significant_brands.index].to_numpy()
+    display_labels = (significant_brands.index.astype(str) + ' (' + significant_brands.map('{:.1f}'.format).to_numpy() + '%)').tolist()
+    
+    # Add combined "Other" if it exists
+    if others_total_pct > 0:
+        others_revenue = all_parent_revenue[small_brands.index].sum()
+        if 'Other' in all_parent_revenue.index:
+            others_revenue += all_parent_revenue['Other']
+        display_data = np.append(display_data, others_revenue)
+        display_labels.append(f"Other ({others_total_pct:.1f}%)")
+    
+    fig = pie_chart(pd.Series(display_data, index=display_labels), px.colors.sequential.Reds_r)
+    fig.update_traces(
+        textposition='auto',
+        textinfo='label', 
+        textfont_size=11
+    )
+    fig.update_layout(showlegend=False, height=400, margin=dict(t=40, b=40, l=40, r=40))
+    return fig
+
+@st.cache_resource
+def top_brands_bar(top_brand_revenue, colors):
+    fig = go.Figure(layout=dict(uirevision='soda'))
+    fig.add_trace(go.Bar(
+        y=top_brand_revenue.index.to_numpy(),
+        x=top_brand_revenue.to_numpy() / 1000,  # Convert to K
+        orientation='h',
+        marker=dict(color=colors),
+        marker_line_width=0,
+        text=top_brand_revenue.to_numpy() / 1000,  # Show in K
+        texttemplate='$%{text:.0f}K',
+        textposition='outside'
+    ))
+    fig.update_layout(
+        xaxis_title="Revenue ($K)",
+        yaxis_title="",
+        height=450,
+        showlegend=False,
+        margin=dict(l=150, r=100, t=40, b=40)
+    )
+    fig.update_xaxes(showgrid=True, gridcolor='lightgray', range=[0, top_brand_revenue.max()/1000 * 1.15])
+    # Explicit category order (largest on top) so Plotly doesn't sort the axis itself
+    fig.update_yaxes(categoryorder='array', categoryarray=list(top_brand_revenue.index[::-1]))
+    return fig
+
+@st.cache_resource
+def type_brand_pie(plot_data, colors, title):
+    fig = pie_chart(plot_data, colors, title=title)
+    fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=10)
+    fig.update_layout(showlegend=False, height=300, margin=dict(t=40, b=0))
+    return fig
+
+@st.cache_resource
+def type_velocity_bar(type_stats, colors):
+    fig = go.Figure(layout=dict(uirevision='soda'))
+    fig.add_trace(go.Bar(
+        x=type_stats['soda_type'].to_numpy(),
+        y=type_stats['velocity_score'].to_numpy(),
+        marker_color=colors,
+        marker_line_width=0,
+        text=type_stats['velocity_score'].to_numpy(),
+        texttemplate='%{text:.1f}',
+        textposition='outside'
+    ))
+    fig.update_layout(
+        xaxis_title="Soda Type",
+        yaxis_title="Avg Velocity Score",
+        height=300,
+        showlegend=False,
+        margin=dict(t=40, b=50)
+    )
+    fig.update_yaxes(showgrid=True, gridcolor='lightgray', range=[0, 55])
+    return fig
+
+@st.cache_resource
+def type_price_oz_bar(type_price_oz, colors):
+    fig = go.Figure(layout=dict(uirevision='soda'))
+    fig.add_trace(go.Bar(
+        x=type_price_oz.index.to_numpy(),
+        y=type_price_oz.to_numpy(),
+        marker_color=colors,
+        marker_line_width=0,
+        text=type_price_oz.to_numpy(),
+        texttemplate='$%{text:.2f}/oz',
+        textposition='outside'
+    ))
+    fig.update_layout(
+        xaxis_title="Soda Type",
+        yaxis_title="Price per Oz ($)",
+        height=300,
+        showlegend=False,
+        margin=dict(t=40, b=50)
+    )
+    fig.update_yaxes(showgrid=True, gridcolor='lightgray', range=[0, 0.3])
+    return fig
+
+@st.fragment
+def tab2_amazon(bundle):
     st.header("Amazon Soda Category Analysis")
     
-    amazon_df = df[df['Platform'] == 'Amazon'].copy()
-    amazon_filtered = amazon_df.copy()  # No filters - show all data
+    amazon_filtered = bundle.amazon  # No filters - show all data (read-only, no copy)
     
     # Key Metrics
     col1, col2, col3 = st.columns(3)
@@ -262,109 +762,23 @@ with tab2:
     
     with col1:
         st.markdown("**Revenue Share by Soda Type**")
-        type_revenue = amazon_filtered.groupby('soda_type')['estimated_monthly_revenue'].sum().sort_values(ascending=False)
-        
-        fig = px.pie(
-            values=type_revenue.values,
-            names=type_revenue.index,
-            hole=0.4,
-            color=type_revenue.index,
-            color_discrete_map=SODA_TYPE_COLORS
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=12)
-        fig.update_layout(showlegend=False, height=400, margin=dict(t=40, b=0))
-        st.plotly_chart(fig, use_container_width=True)
+        show(amazon_type_pie(bundle.amazon_type_rev), key='amazon_type_pie')
     
     with col2:
         st.markdown("**Parent Company Market Share**")
         
-        # Get all parent brands and calculate true market share percentages
-        all_parent_revenue = amazon_filtered.groupby('parent_brand')['estimated_monthly_revenue'].sum().sort_values(ascending=False)
         total_amazon_revenue = amazon_filtered['estimated_monthly_revenue'].sum()
-        
-        # Calculate percentages
-        all_parent_pct = (all_parent_revenue / total_amazon_revenue) * 100
-        
-        # Separate significant brands (≥5%) and small brands (<5%)
-        significant_brands = all_parent_pct[all_parent_pct >= 5]
-        small_brands = all_parent_pct[(all_parent_pct < 5) & (all_parent_pct.index != 'Other')]
-        
-        # Handle existing "Other" category separately
-        existing_other = all_parent_pct[all_parent_pct.index == 'Other'].sum() if 'Other' in all_parent_pct.index else 0
-        
-        # Combine small brands + existing "Other" into new "Other"
-        others_total_pct = small_brands.sum() + existing_other
-        
-        # Create display data
-        display_data = []
-        display_labels = []
-        
-        # Add significant brands
-        for parent, pct in significant_brands.items():
-            if parent != 'Other':  # Exclude if "Other" somehow has >5%
-                display_data.append(all_parent_revenue[parent])
-                display_labels.append(f"{parent} ({pct:.1f}%)")
-        
-        # Add combined "Other" if it exists
-        if others_total_pct > 0:
-            others_revenue = all_parent_revenue[small_brands.index].sum()
-            if 'Other' in all_parent_revenue.index:
-                others_revenue += all_parent_revenue['Other']
-            display_data.append(others_revenue)
-            display_labels.append(f"Other ({others_total_pct:.1f}%)")
-        
-        fig = px.pie(
-            values=display_data,
-            names=display_labels,
-            hole=0.4,
-            color_discrete_sequence=px.colors.sequential.Reds_r
-        )
-        fig.update_traces(
-            textposition='auto',
-            textinfo='label', 
-            textfont_size=11
-        )
-        fig.update_layout(showlegend=False, height=400, margin=dict(t=40, b=40, l=40, r=40))
-        st.plotly_chart(fig, use_container_width=True)
+        show(amazon_parent_pie(bundle.amazon_parent_rev, total_amazon_revenue), key='amazon_parent_pie')
     
     st.markdown("---")
     
     # Row 2: Top 10 Brands (full width)
     st.markdown("**Top 10 Individual Brands by Revenue**")
-    brand_revenue = amazon_filtered.groupby('brand_clean')['estimated_monthly_revenue'].sum().sort_values(ascending=False).head(10)
+    top_brand_revenue = bundle.amazon_top_brands
     
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        y=brand_revenue.index,
-        x=brand_revenue.values / 1000,  # Convert to K
-        orientation='h',
-        marker=dict(color=[BRAND_COLORS.get(brand, '#06D6A0') for brand in brand_revenue.index]),
-        text=brand_revenue.values / 1000,  # Show in K
-        texttemplate='$%{text:.0f}K',
-        textposition='outside'
-    ))
-    fig.update_layout(
-        xaxis_title="Revenue ($K)",
-        yaxis_title="",
-        height=450,
-        showlegend=False,
-        margin=dict(l=150, r=100, t=40, b=40)
-    )
-    fig.update_xaxes(showgrid=True, gridcolor='lightgray', range=[0, brand_revenue.max()/1000 * 1.15])
-    st.plotly_chart(fig, use_container_width=True)
+    show(top_brands_bar(top_brand_revenue, bundle.amazon_top_brand_colors), key='amazon_top_brands_bar')
     
-    st.markdown("""
-    <div style='background: #e3f2fd; padding: 20px; border-radius: 10px; margin-bottom: 20px;'>
-        <h4 style='margin-top: 0; color: #1a1a1a;'>💡 Brand vs Parent Company:</h4>
-        <ul style='line-height: 2; color: #1a1a1a;'>
-            <li><strong>Individual brands:</strong> Coca-Cola ($743K) similar to poppi ($742K)</li>
-            <li><strong>Parent companies:</strong> Coca-Cola Company ($2.6M) much larger than PepsiCo ($1.7M)</li>
-            <li><strong>Why?</strong> Coca-Cola Company owns 12+ brands (Diet Coke, Coke Zero, Sprite, Health-Ade, etc.) - excludes fountain/foodservice</li>
-            <li>🔥 <strong>Recent Acquisition:</strong> poppi acquired by PepsiCo (2025) - doubled PepsiCo market share from 12.9% to 23.3%</li>
-            <li><strong>OLIPOP remains independent</strong> - the last major standalone modern soda brand</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(BRAND_VS_PARENT_HTML)
     
     st.markdown("---")
     
@@ -375,85 +789,28 @@ with tab2:
     
     # Modern Brands
     with col1:
-        modern_df = amazon_filtered[amazon_filtered['soda_type'] == 'Modern']
-        modern_total = modern_df['estimated_monthly_revenue'].sum()
-        modern_brands = modern_df.groupby('brand_clean')['estimated_monthly_revenue'].sum().sort_values(ascending=False)
-        
-        # Group smaller brands as "Others"
-        top_brands = modern_brands.head(4)
-        others = modern_brands.iloc[4:].sum()
+        modern_total = bundle.amazon_type_rev.get('Modern', 0)
+        plot_data = bundle.type_brand_share['Modern']
         
-        if others > 0:
-            plot_data = pd.concat([top_brands, pd.Series({'Others': others})])
-        else:
-            plot_data = top_brands
-        
-        fig = px.pie(
-            values=plot_data.values,
-            names=plot_data.index,
-            title="Modern Soda Brands",
-            hole=0.4,
-            color_discrete_sequence=px.colors.sequential.Greens_r
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=10)
-        fig.update_layout(showlegend=False, height=300, margin=dict(t=40, b=0))
-        st.plotly_chart(fig, use_container_width=True)
+        show(type_brand_pie(plot_data, px.colors.sequential.Greens_r, "Modern Soda Brands"), key='modern_brands_pie')
         
         st.metric("Total Modern Revenue", f"${modern_total/1e6:.2f}M")
     
     # Traditional Brands
     with col2:
-        trad_df = amazon_filtered[amazon_filtered['soda_type'] == 'Traditional']
-        trad_total = trad_df['estimated_monthly_revenue'].sum()
-        trad_brands = trad_df.groupby('brand_clean')['estimated_monthly_revenue'].sum().sort_values(ascending=False)
-        
-        # Group smaller brands as "Others"
-        top_brands = trad_brands.head(5)
-        others = trad_brands.iloc[5:].sum()
-        
-        if others > 0:
-            plot_data = pd.concat([top_brands, pd.Series({'Others': others})])
-        else:
-            plot_data = top_brands
+        trad_total = bundle.amazon_type_rev.get('Traditional', 0)
+        plot_data = bundle.type_brand_share['Traditional']
         
-        fig = px.pie(
-            values=plot_data.values,
-            names=plot_data.index,
-            title="Traditional Soda Brands",
-            hole=0.4,
-            color_discrete_sequence=px.colors.sequential.Reds_r
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=10)
-        fig.update_layout(showlegend=False, height=300, margin=dict(t=40, b=0))
-        st.plotly_chart(fig, use_container_width=True)
+        show(type_brand_pie(plot_data, px.colors.sequential.Reds_r, "Traditional Soda Brands"), key='traditional_brands_pie')
         
         st.metric("Total Traditional Revenue", f"${trad_total/1e6:.2f}M")
     
     # Diet Brands
     with col3:
-        diet_df = amazon_filtered[amazon_filtered['soda_type'] == 'Diet']
-        diet_total = diet_df['estimated_monthly_revenue'].sum()
-        diet_brands = diet_df.groupby('brand_clean')['estimated_monthly_revenue'].sum().sort_values(ascending=False)
-        
-        # Group smaller brands as "Others"
-        top_brands = diet_brands.head(5)
-        others = diet_brands.iloc[5:].sum()
+        diet_total = bundle.amazon_type_rev.get('Diet', 0)
+        plot_data = bundle.type_brand_share['Diet']
         
-        if others > 0:
-            plot_data = pd.concat([top_brands, pd.Series({'Others': others})])
-        else:
-            plot_data = top_brands
-        
-        fig = px.pie(
-            values=plot_data.values,
-            names=plot_data.index,
-            title="Diet Soda Brands",
-            hole=0.4,
-            color_discrete_sequence=px.colors.sequential.Blues_r
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=10)
-        fig.update_layout(showlegend=False, height=300, margin=dict(t=40, b=0))
-        st.plotly_chart(fig, use_container_width=True)
+        show(type_brand_pie(plot_data, px.colors.sequential.Blues_r, "Diet Soda Brands"), key='diet_brands_pie')
         
         st.metric("Total Diet Revenue", f"${diet_total/1e6:.2f}M")
     
@@ -470,154 +827,30 @@ with tab2:
     st.markdown("<div id='parent-brand-dive'></div>", unsafe_allow_html=True)
     st.subheader("Parent Brand Deep Dive")
     
-    st.info("💡 **Note:** Changing the selection will refresh the page. Your selection will persist.")
-    
-    parent_revenue = amazon_filtered.groupby('parent_brand')['estimated_monthly_revenue'].sum().sort_values(ascending=False)
-    top_parents = parent_revenue.head(10).index.tolist()
-    
-    selected_parent = st.selectbox(
-        "Select Parent Brand:",
-        options=top_parents,
-        key='parent_brand_selector',
-        help="Analyze sub-brand performance within parent company"
-    )
-    
-    parent_df = amazon_filtered[amazon_filtered['parent_brand'] == selected_parent]
-    parent_total_revenue = parent_df['estimated_monthly_revenue'].sum()
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Total SKUs", len(parent_df))
-    with col2:
-        st.metric("Total Revenue", f"${parent_total_revenue/1e6:.2f}M")
-    with col3:
-        market_share = (parent_total_revenue / amazon_filtered['estimated_monthly_revenue'].sum() * 100)
-        st.metric("Market Share", f"{market_share:.1f}%")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("**Sub-Brand Revenue Breakdown**")
-        
-        # Calculate total revenue and percentages
-        subbrand_revenue = parent_df.groupby('brand_clean')['estimated_monthly_revenue'].sum()
-        total_revenue = subbrand_revenue.sum()
-        subbrand_pct = (subbrand_revenue / total_revenue * 100).sort_values(ascending=False)
-        
-        # Separate brands >5% and group rest as "Others"
-        significant_brands = subbrand_pct[subbrand_pct >= 5]
-        others_total = subbrand_pct[subbrand_pct < 5].sum()
-        
-        # Combine for display
-        if others_total > 0:
-            display_data = pd.concat([
-                significant_brands,
-                pd.Series({'Others': others_total})
-            ])
-        else:
-            display_data = significant_brands
-        
-        # Get corresponding revenue values
-        display_revenue = []
-        for brand in display_data.index:
-            if brand == 'Others':
-                display_revenue.append(subbrand_revenue[subbrand_pct < 5].sum())
-            else:
-                display_revenue.append(subbrand_revenue[brand])
-        
-        fig = px.pie(
-            values=display_revenue,
-            names=display_data.index,
-            color=display_data.index,
-            color_discrete_map={**BRAND_COLORS, 'Others': '#CCCCCC'}
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=11)
-        fig.update_layout(showlegend=False, height=300, margin=dict(t=0, b=0))
-        st.plotly_chart(fig, use_container_width=True)
+    st.info("💡 **Note:** Changing the selection only refreshes this section.")
     
-    with col2:
-        st.markdown("**Top 5 SKUs by Revenue**")
-        top_skus = parent_df.nlargest(5, 'estimated_monthly_revenue')[
-            ['brand_clean', 'title', 'estimated_monthly_revenue', 'velocity_score', 'pack_size']
-        ]
-        
-        for idx, row in top_skus.iterrows():
-            title_short = row['title'][:40] + '...' if len(row['title']) > 40 else row['title']
-            col_a, col_b = st.columns([3, 1])
-            with col_a:
-                st.markdown(f"**{row['brand_clean']}** - {title_short}")
-            with col_b:
-                st.markdown(f"${row['estimated_monthly_revenue']/1000:.0f}K")
+    parent_brand_section(amazon_filtered, bundle.amazon_by_parent, bundle.amazon_subbrand_rev, bundle.amazon_top_parents)
     
     st.markdown("---")
     
     # SECTION 4: Soda Type Analysis - MODIFIED (Velocity + Price)
     st.subheader("Soda Type Performance: Velocity & Pricing")
     
-    type_analysis = amazon_filtered.groupby('soda_type').agg({
-        'velocity_score': 'mean',
-        'estimated_monthly_revenue': 'sum'
-    }).reset_index()
+    type_stats = bundle.amazon_type_analysis
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Velocity Score by Type - NEW CHART
         st.markdown("**Average Velocity Score by Type**")
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=type_analysis['soda_type'],
-            y=type_analysis['velocity_score'],
-            marker_color=[SODA_TYPE_COLORS[t] for t in type_analysis['soda_type']],
-            text=type_analysis['velocity_score'].apply(lambda x: f'{x:.1f}'),
-            textposition='outside'
-        ))
-        fig.update_layout(
-            xaxis_title="Soda Type",
-            yaxis_title="Avg Velocity Score",
-            height=300,
-            showlegend=False,
-            margin=dict(t=40, b=50)
-        )
-        fig.update_yaxes(showgrid=True, gridcolor='lightgray', range=[0, 55])
-        st.plotly_chart(fig, use_container_width=True)
+        show(type_velocity_bar(type_stats, bundle.amazon_type_colors), key='type_velocity_bar')
     
     with col2:
         # Volume-weighted price per oz (CORRECT formula)
         st.markdown("**Avg Price per Oz by Type (Volume-Weighted)**")
-        type_price_oz_data = []
-        for soda_type in ['Modern', 'Traditional', 'Diet']:
-            type_df = amazon_filtered[(amazon_filtered['soda_type'] == soda_type) & 
-                                     (amazon_filtered['price'].notna()) & 
-                                     (amazon_filtered['volume_oz'].notna()) &
-                                     (amazon_filtered['pack_size'].notna()) &
-                                     (amazon_filtered['units_sold_last_month'].notna())]
-            if len(type_df) > 0:
-                # Correct formula: Σ(price × units) / Σ(volume_oz × pack_size × units)
-                numerator = (type_df['price'] * type_df['units_sold_last_month']).sum()
-                denominator = (type_df['volume_oz'] * type_df['pack_size'] * type_df['units_sold_last_month']).sum()
-                weighted_price_oz = numerator / denominator
-                type_price_oz_data.append({'soda_type': soda_type, 'price_per_oz': weighted_price_oz})
+        type_price_oz = bundle.type_weighted_price_oz
         
-        type_price_oz = pd.DataFrame(type_price_oz_data).sort_values('price_per_oz', ascending=False)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=type_price_oz['soda_type'],
-            y=type_price_oz['price_per_oz'],
-            marker_color=[SODA_TYPE_COLORS[t] for t in type_price_oz['soda_type']],
-            text=type_price_oz['price_per_oz'].apply(lambda x: f'${x:.2f}/oz'),
-            textposition='outside'
-        ))
-        fig.update_layout(
-            xaxis_title="Soda Type",
-            yaxis_title="Price per Oz ($)",
-            height=300,
-            showlegend=False,
-            margin=dict(t=40, b=50)
-        )
-        fig.update_yaxes(showgrid=True, gridcolor='lightgray', range=[0, 0.3])
-        st.plotly_chart(fig, use_container_width=True)
+        show(type_price_oz_bar(type_price_oz, bundle.type_price_oz_colors), key='type_price_oz_bar')
 
     
     # Combined Insight Box
@@ -642,33 +875,33 @@ with tab2:
     
     with col1:
         st.markdown("**Top 10 Highest Velocity Products**")
-        high_velocity = amazon_filtered.nlargest(10, 'velocity_score')[
-            ['brand_clean', 'title', 'velocity_score', 'soda_type']
-        ]
+        high_velocity = bundle.amazon_top_velocity
         
-        for idx, row in high_velocity.iterrows():
-            title_short = row['title'][:45] + '...' if len(row['title']) > 45 else row['title']
-            col_a, col_b, col_c = st.columns([2, 1, 1])
-            with col_a:
-                st.markdown(f"{title_short}")
-            with col_b:
-                type_color = SODA_TYPE_COLORS[row['soda_type']]
-                st.markdown(f"<span style='background-color: {type_color}; padding: 2px 8px; border-radius: 4px; color: white;'>{row['soda_type']}</span>", unsafe_allow_html=True)
-            with col_c:
-                st.markdown(f"**{row['velocity_score']:.1f}**")
+        velocity_display = pd.DataFrame({
+            'Product': short_titles(high_velocity['title'], 45),
+            'Type': high_velocity['soda_type'].astype(str),
+            'Velocity': high_velocity['velocity_score'],
+        })
+        # Soda type badge colors carried over as cell backgrounds (CSS precomputed in the bundle)
+        velocity_styled = velocity_display.style.apply(
+            lambda _: bundle.amazon_top_velocity_badge_css, subset=['Type']
+        )
+        st.dataframe(
+            velocity_styled,
+            hide_index=True,
+            width='stretch',
+            column_config={
+                'Type': st.column_config.TextColumn(),
+                'Velocity': st.column_config.NumberColumn(format='%.1f'),
+            }
+        )
     
     with col2:
         st.markdown("**🎯 Key Observation**")
         
-        modern_in_top10 = len(high_velocity[high_velocity['soda_type'] == 'Modern'])
+        modern_in_top10 = (high_velocity['soda_type'] == 'Modern').sum()
         
-        st.markdown(f"""
-        <div style='background: #e8f5e9; padding: 15px; border-radius: 8px; border-left: 5px solid #4caf50;'>
-            <p style='margin: 0; font-size: 14px; color: #1a1a1a;'><strong>{modern_in_top10}/10 top velocity products are Modern sodas!</strong></p>
-            <br>
-            <p style='margin: 0; font-size: 13px; color: #1a1a1a;'>Modern brands dominate high-velocity segment</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(VELOCITY_OBSERVATION_HTML.format(modern_count=modern_in_top10))
     
     st.markdown("---")
     
@@ -709,32 +942,117 @@ with tab2:
     can outperform traditional giants through search discovery and review influence.
     """)
 
+if tab2.open:
+    with tab2:
+        tab2_amazon(bundle)
+
+
 # ============================================================================
 # TAB 3: WALMART & CROSS-PLATFORM (KEEP AS IS FROM ORIGINAL)
 # ============================================================================
 
-with tab3:
-    st.header("Walmart Analysis")
+# Static HTML blocks, built once at import
+PLATFORM_DIFFERENCES_HTML = """
+<div style='background: #e8f5e9; padding: 20px; border-radius: 10px; border-left: 5px solid #4caf50;'>
+    <h4 style='color: #1a1a1a;'>🏪 Platform Differences</h4>
+    <ul style='color: #1a1a1a;'>
+        <li><strong>Walmart:</strong> 37% bulk packs (grocery stocking)</li>
+        <li><strong>Amazon:</strong> 27% bulk packs (variety focus)</li>
+        <li><strong>Price gap:</strong> Walmart 50-60% cheaper</li>
+        <li><strong>Behavior:</strong> Essentials vs Discovery</li>
+    </ul>
+</div>
+"""
+
+PLATFORM_USE_CASES_HTML = """
+<div style='background: #fff3e0; padding: 20px; border-radius: 10px; border-left: 5px solid #ff9800;'>
+    <h4 style='color: #1a1a1a;'>⚠️ Use Cases</h4>
+    <ul style='color: #1a1a1a;'>
+        <li><strong>Good for:</strong> Brand presence, relative ranking</li>
+        <li><strong>Good for:</strong> Historical popularity trends</li>
+        <li><strong>Not for:</strong> Current velocity estimates</li>
+        <li><strong>Not for:</strong> Absolute revenue comparison</li>
+    </ul>
+</div>
+"""
+
+# Walmart tab figures depend only on the cached data, so build each once per process
+@st.cache_resource
+def walmart_type_pie(proxy_by_type):
+    fig = pie_chart(proxy_by_type, TYPE_COLOR_S.reindex(proxy_by_type.index).to_numpy(),
+                    title="Revenue Proxy by Soda Type", hole=0)
+    fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=13)
+    fig.update_layout(
+        height=450,
+        margin=dict(t=60, b=20, l=20, r=20)
+    )
+    return fig
+
+@st.cache_resource
+def walmart_parent_pie(proxy_by_parent):
+    fig = pie_chart(proxy_by_parent, px.colors.sequential.Blues_r,
+                    title="Revenue Proxy by Parent Brand", hole=0)
+    fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=13)
+    fig.update_layout(
+        height=450,
+        showlegend=False,
+        margin=dict(t=60, b=20, l=20, r=20)
+    )
+    return fig
+
+@st.cache_resource
+def price_comparison_bar(comparison_df):
+    fig = go.Figure(layout=dict(uirevision='soda'))
+    fig.add_trace(go.Bar(
+        name='Amazon',
+        y=comparison_df['brand'].to_numpy(),
+        x=comparison_df['amazon_price'].to_numpy(),
+        orientation='h',
+        marker_color='#FF9800',
+        marker_line_width=0,
+        text=comparison_df['amazon_price'].to_numpy(),
+        texttemplate='$%{text:.2f}',
+        textposition='outside'
+    ))
+    fig.add_trace(go.Bar(
+        name='Walmart',
+        y=comparison_df['brand'].to_numpy(),
+        x=comparison_df['walmart_price'].to_numpy(),
+        orientation='h',
+        marker_color='#0071CE',
+        marker_line_width=0,
+        text=comparison_df['walmart_price'].to_numpy(),
+        texttemplate='$%{text:.2f}',
+        textposition='outside'
+    ))
     
-    walmart_df = df[df['Platform'] == 'Walmart'].copy()
-    walmart_filtered = walmart_df.copy()  # No filters - show all data
+    fig.update_layout(
+        title="Average Price by Brand: Amazon vs Walmart",
+        xaxis_title="Average Price ($)",
+        height=400,
+        barmode='group',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    fig.update_yaxes(title="Brand")
+    fig.update_xaxes(showgrid=True, gridcolor='lightgray')
+    return fig
+
+@st.fragment
+def tab3_walmart(bundle):
+    st.header("Walmart Analysis")
     
     # Key Metrics
     st.markdown("### Walmart Overview")
     
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric("Total Products", len(walmart_filtered))
-    
-    with col2:
-        total_proxy = walmart_filtered['revenue_proxy'].sum()
-        st.metric("Revenue Proxy", f"${total_proxy/1e6:.2f}M", 
-                 help="Reviews × Price (historical indicator)")
+    summary = bundle.walmart_summary
+    total_count = summary['n']
+    total_proxy = summary['proxy']
     
-    with col3:
-        avg_price = walmart_filtered['price'].mean()
-        st.metric("Avg Price", f"${avg_price:.2f}")
+    metric_row([
+        ("Total Products", total_count),
+        ("Revenue Proxy", f"${total_proxy/1e6:.2f}M", "Reviews × Price (historical indicator)"),
+        ("Avg Price", f"${summary['avg_price']:.2f}"),
+    ])
     
     st.markdown("---")
     
@@ -745,39 +1063,13 @@ with tab3:
     
     with col1:
         # Revenue proxy by soda type
-        proxy_by_type = walmart_filtered.groupby('soda_type')['revenue_proxy'].sum()
-        
-        fig = px.pie(
-            values=proxy_by_type.values,
-            names=proxy_by_type.index,
-            title="Revenue Proxy by Soda Type",
-            color=proxy_by_type.index,
-            color_discrete_map=SODA_TYPE_COLORS
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=13)
-        fig.update_layout(
-            height=450,
-            margin=dict(t=60, b=20, l=20, r=20)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        proxy_by_type = bundle.walmart_proxy_by_type
+        show(walmart_type_pie(proxy_by_type), key='walmart_type_pie')
     
     with col2:
         # Revenue proxy by parent brand
-        proxy_by_parent = walmart_filtered.groupby('parent_brand')['revenue_proxy'].sum().sort_values(ascending=False).head(5)
-        
-        fig = px.pie(
-            values=proxy_by_parent.values,
-            names=proxy_by_parent.index,
-            title="Revenue Proxy by Parent Brand",
-            color_discrete_sequence=px.colors.sequential.Blues_r
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label', textfont_size=13)
-        fig.update_layout(
-            height=450,
-            showlegend=False,
-            margin=dict(t=60, b=20, l=20, r=20)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        proxy_by_parent = bundle.walmart_proxy_by_parent
+        show(walmart_parent_pie(proxy_by_parent), key='walmart_parent_pie')
         
     # Revenue Proxy Leaders
     st.subheader("Revenue Proxy Leaders")
@@ -788,19 +1080,26 @@ with tab3:
     - Use for relative comparisons, NOT absolute revenue
     """)
     
-    top_proxy = walmart_filtered.nlargest(10, 'revenue_proxy')[
-        ['brand_clean', 'title', 'review_count', 'price', 'revenue_proxy']
-    ]
-    
-    for idx, row in top_proxy.iterrows():
-        col_a, col_b, col_c = st.columns([3, 2, 1])
-        with col_a:
-            title_short = row['title'][:50] + '...' if len(row['title']) > 50 else row['title']
-            st.markdown(f"**{row['brand_clean']}** - {title_short}")
-        with col_b:
-            st.markdown(f"{int(row['review_count']):,} reviews × ${row['price']:.2f}")
-        with col_c:
-            st.markdown(f"**${row['revenue_proxy']/1000:.0f}K**")
+    top_proxy = bundle.walmart_top_proxy
+    
+    # One table element instead of a columns/markdown triple per row
+    top_proxy_display = pd.DataFrame({
+        'Brand': top_proxy['brand_clean'],
+        'Product': short_titles(top_proxy['title'], 50),
+        'Reviews': top_proxy['review_count'],
+        'Price': top_proxy['price'],
+        'Revenue Proxy': top_proxy['revenue_proxy'] / 1000,
+    })
+    st.dataframe(
+        top_proxy_display,
+        hide_index=True,
+        width='stretch',
+        column_config={
+            'Reviews': st.column_config.NumberColumn(format='localized'),
+            'Price': st.column_config.NumberColumn(format='$%.2f'),
+            'Revenue Proxy': st.column_config.NumberColumn(format='$%.0fK'),
+        }
+    )
     
     st.markdown("---")
     
@@ -808,37 +1107,34 @@ with tab3:
     st.subheader("Walmart Private Label vs Branded")
     
     # Calculate private label stats
-    walmart_filtered['is_private'] = walmart_filtered['brand_clean'].apply(
-        lambda x: any(brand.lower() in str(x).lower() for brand in ['great value', 'sam', 'member']) if pd.notna(x) else False
-    )
-    
-    private_df = walmart_filtered[walmart_filtered['is_private'] == True]
-    branded_df = walmart_filtered[walmart_filtered['is_private'] == False]
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        private_count = len(private_df)
-        total_count = len(walmart_filtered)
-        st.metric("Private Label SKUs", f"{private_count} ({private_count/total_count*100:.1f}%)")
-    
-    with col2:
-        private_proxy = private_df['revenue_proxy'].sum()
-        total_proxy = walmart_filtered['revenue_proxy'].sum()
-        st.metric("Private Label Revenue Proxy", f"${private_proxy/1e6:.2f}M ({private_proxy/total_proxy*100:.1f}%)")
-    
-    with col3:
-        price_discount = (1 - private_df['price'].mean() / branded_df['price'].mean()) * 100
-        st.metric("Avg Price Discount", f"{price_discount:.0f}%")
+    private_count = summary['private_n']
+    private_proxy = summary['private_proxy']
+    price_discount = (1 - summary['private_price'] / summary['branded_price']) * 100
+    metric_row([
+        ("Private Label SKUs", f"{private_count} ({private_count/total_count*100:.1f}%)"),
+        ("Private Label Revenue Proxy", f"${private_proxy/1e6:.2f}M ({private_proxy/total_proxy*100:.1f}%)"),
+        ("Avg Price Discount", f"{price_discount:.0f}%"),
+    ])
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**Top Private Label Products:**")
-        top_private = private_df.nlargest(5, 'revenue_proxy')[['title', 'price', 'review_count', 'revenue_proxy']]
-        for idx, row in top_private.iterrows():
-            title_clean = row['title'].replace('Great Value', 'GV').replace('Soda Pop', '')[:45]
-            st.markdown(f"• **{title_clean}** - ${row['price']:.2f} ({int(row['review_count'])} reviews)")
+        top_private = bundle.walmart_top_private
+        top_private_display = pd.DataFrame({
+            'Product': top_private['title'].str.replace('Great Value', 'GV', regex=False).str.replace('Soda Pop', '', regex=False).str.slice(0, 45),
+            'Price': top_private['price'],
+            'Reviews': top_private['review_count'],
+        })
+        st.dataframe(
+            top_private_display,
+            hide_index=True,
+            width='stretch',
+            column_config={
+                'Price': st.column_config.NumberColumn(format='$%.2f'),
+                'Reviews': st.column_config.NumberColumn(format='%d'),
+            }
+        )
     
     with col2:
         st.markdown("**Key Insights:**")
@@ -864,87 +1160,91 @@ with tab3:
     st.subheader("💵 Price Comparison: Amazon vs Walmart")
     
     # Brand price comparison
-    brands_both_platforms = []
-    for brand in df['brand_clean'].unique():
-        amazon_brand = amazon_df[amazon_df['brand_clean'] == brand]
-        walmart_brand = walmart_df[walmart_df['brand_clean'] == brand]
-        
-        if len(amazon_brand) > 0 and len(walmart_brand) > 0:
-            brands_both_platforms.append({
-                'brand': brand,
-                'amazon_price': amazon_brand['price'].mean(),
-                'walmart_price': walmart_brand['price'].mean()
-            })
-    
-    if brands_both_platforms:
-        comparison_df = pd.DataFrame(brands_both_platforms).sort_values('amazon_price', ascending=False).head(8)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            name='Amazon',
-            y=comparison_df['brand'],
-            x=comparison_df['amazon_price'],
-            orientation='h',
-            marker_color='#FF9800',
-            text=comparison_df['amazon_price'].apply(lambda x: f'${x:.2f}'),
-            textposition='outside'
-        ))
-        fig.add_trace(go.Bar(
-            name='Walmart',
-            y=comparison_df['brand'],
-            x=comparison_df['walmart_price'],
-            orientation='h',
-            marker_color='#0071CE',
-            text=comparison_df['walmart_price'].apply(lambda x: f'${x:.2f}'),
-            textposition='outside'
-        ))
-        
-        fig.update_layout(
-            title="Average Price by Brand: Amazon vs Walmart",
-            xaxis_title="Average Price ($)",
-            height=400,
-            barmode='group',
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        fig.update_yaxes(title="Brand")
-        fig.update_xaxes(showgrid=True, gridcolor='lightgray')
-        st.plotly_chart(fig, use_container_width=True)
+    comparison_df = bundle.platform_price_comparison
+    
+    if not comparison_df.empty:
+        show(price_comparison_bar(comparison_df), key='price_comparison_bar')
     
     # Platform summary
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        <div style='background: #e8f5e9; padding: 20px; border-radius: 10px; border-left: 5px solid #4caf50;'>
-            <h4 style='color: #1a1a1a;'>🏪 Platform Differences</h4>
-            <ul style='color: #1a1a1a;'>
-                <li><strong>Walmart:</strong> 37% bulk packs (grocery stocking)</li>
-                <li><strong>Amazon:</strong> 27% bulk packs (variety focus)</li>
-                <li><strong>Price gap:</strong> Walmart 50-60% cheaper</li>
-                <li><strong>Behavior:</strong> Essentials vs Discovery</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(PLATFORM_DIFFERENCES_HTML)
     
     with col2:
-        st.markdown("""
-        <div style='background: #fff3e0; padding: 20px; border-radius: 10px; border-left: 5px solid #ff9800;'>
-            <h4 style='color: #1a1a1a;'>⚠️ Use Cases</h4>
-            <ul style='color: #1a1a1a;'>
-                <li><strong>Good for:</strong> Brand presence, relative ranking</li>
-                <li><strong>Good for:</strong> Historical popularity trends</li>
-                <li><strong>Not for:</strong> Current velocity estimates</li>
-                <li><strong>Not for:</strong> Absolute revenue comparison</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(PLATFORM_USE_CASES_HTML)
+
+if tab3.open:
+    with tab3:
+        tab3_walmart(bundle)
 
 
 # ============================================================================
 # TAB 4: ONLINE VS OFFLINE REALITY
 # ============================================================================
 
-with tab4:
+# Static HTML blocks, built once at import
+MODERN_ONLINE_ADVANTAGES_HTML = """
+<div style='background: #e8f5e9; padding: 20px; border-radius: 10px; border-left: 5px solid #4caf50;'>
+    <h4 style='color: #1a1a1a;'>✅ Amazon Advantages for Modern Brands</h4>
+    <ul style='color: #1a1a1a;'>
+        <li><strong>Search Discovery:</strong> "Healthy soda" "prebiotic soda" → Modern brands rank #1</li>
+        <li><strong>Review Influence:</strong> 4.5-star ratings drive conversions</li>
+        <li><strong>Subscription Model:</strong> 15-20% subscribe & save adoption</li>
+        <li><strong>DTC Strategy:</strong> Modern brands prioritize Amazon (higher margins)</li>
+        <li><strong>No Shelf Space Battle:</strong> Equal visibility vs Coke/Pepsi</li>
+        <li><strong>Content Rich:</strong> Product descriptions educate on benefits</li>
+    </ul>
+</div>
+"""
+
+MODERN_OFFLINE_CHALLENGES_HTML = """
+<div style='background: #fff3e0; padding: 20px; border-radius: 10px; border-left: 5px solid #ff9800;'>
+    <h4 style='color: #1a1a1a;'>Offline Challenges for Modern Brands</h4>
+    <ul style='color: #1a1a1a;'>
+        <li><strong>Limited Distribution:</strong> Not in gas stations, vending machines</li>
+        <li><strong>Shelf Space Battle:</strong> Coke/Pepsi control 70%+ of space</li>
+        <li><strong>Impulse Purchase:</strong> Traditional sodas dominate point-of-sale</li>
+        <li><strong>Price Perception:</strong> $2.50/can seems expensive next to $1 Coke</li>
+        <li><strong>Brand Awareness:</strong> Low recognition outside health-conscious demo</li>
+        <li><strong>Restaurant/Fountain:</strong> Zero presence in foodservice</li>
+    </ul>
+</div>
+"""
+
+POPPI_ACQUISITION_HTML = """
+<div style='background: linear-gradient(135deg, #2196f3 0%, #03a9f4 100%); padding: 25px; border-radius: 10px; color: white; margin-bottom: 20px;'>
+    <h4 style='margin-top: 0; color: white;'>🎯 Why PepsiCo Paid $1.95B for poppi</h4>
+    <p style='margin: 0; font-size: 15px; line-height: 1.8;'>
+        PepsiCo wasn't buying current market share (3-4% offline). They were buying:<br>
+        <br>
+        1️⃣ <strong>Online Dominance:</strong> poppi owns Amazon discovery (25% tracked share)<br>
+        2️⃣ <strong>Offline Potential:</strong> Expand poppi to PepsiCo's massive distribution network<br>
+        3️⃣ <strong>Consumer Trend:</strong> Gen Z/Millennials shifting to functional beverages<br>
+        4️⃣ <strong>Growth Trajectory:</strong> Modern soda market growing 83% YoY (Circana)<br>
+        5️⃣ <strong>Competitive Response:</strong> Coca-Cola launched Simply Pop; PepsiCo needed modern play<br>
+        <br>
+        <strong>The Playbook:</strong> Win Online → Leverage CPG Distribution → Scale Offline
+    </p>
+</div>
+"""
+
+ONLINE_OFFLINE_SUMMARY_HTML = """
+<div style='background: #f5f5f5; padding: 25px; border-radius: 10px; margin-bottom: 20px;'>
+    <h4 style='margin-top: 0; color: #1a1a1a;'>Key Points to Remember:</h4>
+    <ol style='line-height: 2; color: #1a1a1a;'>
+        <li><strong>Amazon ≠ Total Market:</strong> This dashboard shows 436 Amazon products, not the $50-55B CSD market</li>
+        <li><strong>Online = 5% of Sales:</strong> 95% of sodas sold offline (convenience, restaurants, vending)</li>
+        <li><strong>Modern Sodas Over-Index 6-8x Online:</strong> 25% Amazon vs 3-4% offline</li>
+        <li><strong>Different Consumer Behaviors:</strong> Online = discovery/trial, Offline = habit/impulse</li>
+        <li><strong>M&A Driven by Online Signals:</strong> Amazon success validates consumer demand, justifies acquisitions</li>
+        <li><strong>Distribution Still King:</strong> Modern brands need traditional CPG muscle to scale offline</li>
+    </ol>
+</div>
+"""
+
+@st.fragment
+def tab4_reality():
     st.header("Online vs Offline Reality")
     
     # Section 1: Market Size Comparison
@@ -1025,56 +1325,17 @@ with tab4:
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        <div style='background: #e8f5e9; padding: 20px; border-radius: 10px; border-left: 5px solid #4caf50;'>
-            <h4 style='color: #1a1a1a;'>✅ Amazon Advantages for Modern Brands</h4>
-            <ul style='color: #1a1a1a;'>
-                <li><strong>Search Discovery:</strong> "Healthy soda" "prebiotic soda" → Modern brands rank #1</li>
-                <li><strong>Review Influence:</strong> 4.5-star ratings drive conversions</li>
-                <li><strong>Subscription Model:</strong> 15-20% subscribe & save adoption</li>
-                <li><strong>DTC Strategy:</strong> Modern brands prioritize Amazon (higher margins)</li>
-                <li><strong>No Shelf Space Battle:</strong> Equal visibility vs Coke/Pepsi</li>
-                <li><strong>Content Rich:</strong> Product descriptions educate on benefits</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(MODERN_ONLINE_ADVANTAGES_HTML)
     
     with col2:
-        st.markdown("""
-        <div style='background: #fff3e0; padding: 20px; border-radius: 10px; border-left: 5px solid #ff9800;'>
-            <h4 style='color: #1a1a1a;'>Offline Challenges for Modern Brands</h4>
-            <ul style='color: #1a1a1a;'>
-                <li><strong>Limited Distribution:</strong> Not in gas stations, vending machines</li>
-                <li><strong>Shelf Space Battle:</strong> Coke/Pepsi control 70%+ of space</li>
-                <li><strong>Impulse Purchase:</strong> Traditional sodas dominate point-of-sale</li>
-                <li><strong>Price Perception:</strong> $2.50/can seems expensive next to $1 Coke</li>
-                <li><strong>Brand Awareness:</strong> Low recognition outside health-conscious demo</li>
-                <li><strong>Restaurant/Fountain:</strong> Zero presence in foodservice</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(MODERN_OFFLINE_CHALLENGES_HTML)
     
     st.markdown("---")
     
     # Section 3: Strategic Implications
     st.subheader("Strategic Implications & M&A Context")
     
-    st.markdown("""
-    <div style='background: linear-gradient(135deg, #2196f3 0%, #03a9f4 100%); padding: 25px; border-radius: 10px; color: white; margin-bottom: 20px;'>
-        <h4 style='margin-top: 0; color: white;'>🎯 Why PepsiCo Paid $1.95B for poppi</h4>
-        <p style='margin: 0; font-size: 15px; line-height: 1.8;'>
-            PepsiCo wasn't buying current market share (3-4% offline). They were buying:<br>
-            <br>
-            1️⃣ <strong>Online Dominance:</strong> poppi owns Amazon discovery (25% tracked share)<br>
-            2️⃣ <strong>Offline Potential:</strong> Expand poppi to PepsiCo's massive distribution network<br>
-            3️⃣ <strong>Consumer Trend:</strong> Gen Z/Millennials shifting to functional beverages<br>
-            4️⃣ <strong>Growth Trajectory:</strong> Modern soda market growing 83% YoY (Circana)<br>
-            5️⃣ <strong>Competitive Response:</strong> Coca-Cola launched Simply Pop; PepsiCo needed modern play<br>
-            <br>
-            <strong>The Playbook:</strong> Win Online → Leverage CPG Distribution → Scale Offline
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(POPPI_ACQUISITION_HTML)
     
     col1, col2 = st.columns(2)
     
@@ -1107,24 +1368,17 @@ with tab4:
     # Final Summary
     st.subheader("Summary: Online vs Offline Dynamics")
     
-    st.markdown("""
-    <div style='background: #f5f5f5; padding: 25px; border-radius: 10px; margin-bottom: 20px;'>
-        <h4 style='margin-top: 0; color: #1a1a1a;'>Key Points to Remember:</h4>
-        <ol style='line-height: 2; color: #1a1a1a;'>
-            <li><strong>Amazon ≠ Total Market:</strong> This dashboard shows 436 Amazon products, not the $50-55B CSD market</li>
-            <li><strong>Online = 5% of Sales:</strong> 95% of sodas sold offline (convenience, restaurants, vending)</li>
-            <li><strong>Modern Sodas Over-Index 6-8x Online:</strong> 25% Amazon vs 3-4% offline</li>
-            <li><strong>Different Consumer Behaviors:</strong> Online = discovery/trial, Offline = habit/impulse</li>
-            <li><strong>M&A Driven by Online Signals:</strong> Amazon success validates consumer demand, justifies acquisitions</li>
-            <li><strong>Distribution Still King:</strong> Modern brands need traditional CPG muscle to scale offline</li>
-        </ol>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(ONLINE_OFFLINE_SUMMARY_HTML)
     
     st.markdown("""
     *Data Sources: Circana ($1.8B modern sodas, 83% growth), Beverage Digest (brand shares)*
     """)
 
+if tab4.open:
+    with tab4:
+        tab4_reality()
+
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+
+# One-time conversion: Master_Data_Final_Clean.xlsx -> Master_Data_Final_Clean.parquet
+# Run after updating the Excel master:  python convert_to_parquet.py
+
+SOURCE = 'Master_Data_Final_Clean.xlsx'
+TARGET = 'Master_Data_Final_Clean.parquet'
+
+CATEGORY_COLUMNS = ['brand_clean', 'parent_brand', 'soda_type', 'Platform']
+FLOAT32_COLUMNS = ['estimated_monthly_revenue', 'velocity_score', 'price_per_oz', 'price', 'revenue_proxy']
+# Counts; pack_size stays numeric (not category) since it feeds the ounces math
+UNSIGNED_COLUMNS = ['review_count', 'pack_size']
+
+# Compact dtypes for the dashboard columns; app.py applies the same casts on its Excel fallback
+def apply_dtypes(df):
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype('category')
+    
+    for col in FLOAT32_COLUMNS:
+        df[col] = df[col].astype('float32')
+    
+    for col in UNSIGNED_COLUMNS:
+        df[col] = pd.to_numeric(df[col], downcast='unsigned')
+    return df
+
+
+if __name__ == '__main__':
+    df = pd.read_excel(SOURCE)
+    
+    # Mixed int/str columns (Walmart item ids, a numeric brand) can't be written as Arrow strings
+    for col in ['asin', 'brand', 'brand_clean']:
+        df[col] = df[col].astype(str)
+    
+    # Velocity score (0-100) = 100 - ln(BSR) × 10.857, one vectorized log over Amazon's soda BSR.
+    # Walmart rows have no BSR (that column is a 0/1 flag there), so their values are left as-is.
+    is_amazon = (df['Platform'] == 'Amazon').to_numpy()
+    with np.errstate(divide='ignore'):
+        df.loc[is_amazon, 'velocity_score'] = 100 - np.log(df.loc[is_amazon, 'bsr_soda_soft_drinks'].to_numpy()) * 10.857
+    
+    df = apply_dtypes(df)
+    df.to_parquet(TARGET, compression='zstd', index=False)
+    
+    print(f"Wrote {TARGET}: {len(df)} rows, {len(df.columns)} columns")